@@ -1,29 +1,118 @@
-import sys
-import os
+import re
 import uuid
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby
+from operator import itemgetter
 import streamlit as st
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s: %(message)s')
+from src.backend import stream_query_ionos
+from src.storage import ensure_bucket, save_conversation, load_conversation, list_conversations, upload_knowledge_doc
+
 logger = logging.getLogger(__name__)
 
-project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-sys.path.insert(0, project_root)
+_NONBLANK = re.compile(r"\S").search
+
+ABOUT_MD = """
+**Ashley v6** is your IONOS Cloud AI assistant. She can:
+- Answer cloud and infrastructure questions
+- List your datacenters and servers
+- Create new servers on demand
+- Remember your conversations
+- Store and retrieve knowledge documents
+
+Built by **Isayah Young-Burke** for IONOS US Cloud.
+Powered by **Meta-Llama-3.3-70B** via IONOS AI Model Hub.
+"""
+
+QUICK_ACTIONS = (
+    ("quick_0", "List my datacenters"),
+    ("quick_1", "Show all my servers"),
+    ("quick_2", "What server templates are available?"),
+    ("quick_3", "What cloud services does IONOS offer?"),
+    ("quick_4", "List my knowledge base documents"),
+)
+
+# Answers that depend on live account state: these are only deduped while a
+# click is still queued, never once answered, so they can be re-run to refresh
+LIVE_QUICK_ACTIONS = frozenset({
+    "List my datacenters",
+    "Show all my servers",
+    "List my knowledge base documents",
+})
+_ANSWER_DEDUPED = frozenset(question for _, question in QUICK_ACTIONS) - LIVE_QUICK_ACTIONS
+
+HISTORY_WINDOW = 20    # most recent messages rendered in the main chat flow
+
+RESOURCES_MD = """
+- [LinkedIn](https://www.linkedin.com/in/young-burke/)
+- [IONOS Cloud](https://cloud.ionos.com)
+- [IONOS Docs](https://docs.ionos.com)
+- [API Docs](https://api.ionos.com/docs/inference-openai/v1)
+"""
+
+PATCH_NOTES_MD = """
+## Ashley v6
+### New in v6
+* **RAG** — upload docs, Ashley embeds them via `BAAI/bge-large-en-v1.5` and retrieves context on every query
+* **Start / Stop / Delete servers** — full server lifecycle from chat
+* **Server templates** — web, pentest, n8n, db, dev presets
+### v5
+* Llama 3.3 70B, tool calling, streaming, Object Storage, session history
+### v4
+* IONOS Cloud API integration, secure .env credentials
+### v3
+* AshleyAIAssistant class, quick start questions, sidebar
+"""
+
+
+def _configure_logging():
+    # Streamlit reruns this script, so only configure the root logger once
+    if not logging.getLogger().handlers:
+        logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s: %(message)s')
+
+
+@st.cache_resource(show_spinner=False)
+def _ensure_bucket():
+    # Once per server process; Streamlit re-executes this script on every interaction
+    ensure_bucket()
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _list_sessions():
+    """Saved sessions for the sidebar, cached so reruns don't re-list the bucket."""
+    return list_conversations()
 
-try:
-    from src.backend import stream_query_ionos
-    from src.storage import ensure_bucket, save_conversation, load_conversation, list_conversations, upload_knowledge_doc
-except ImportError as e:
-    logger.error(f"Import error: {e}")
-    st.error(f"Critical error: {e}")
-    st.stop()
+
+def _save_executor():
+    # One worker per browser session: its writes land in order and never
+    # queue behind another user's saves
+    if "save_executor" not in st.session_state:
+        st.session_state["save_executor"] = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ashley-save")
+    return st.session_state["save_executor"]
+
+
+def _save_snapshot(wait=False):
+    """Queue a snapshot of the current conversation for Object Storage, optionally waiting for it."""
+    messages = st.session_state["messages"]
+    future = _save_executor().submit(save_conversation, st.session_state["session_id"], list(messages))
+    future.add_done_callback(lambda _: _list_sessions.clear())
+    st.session_state["saved_count"] = len(messages)
+    if wait:
+        future.result()
+
+
+def _flush_unsaved(wait=False):
+    """Write any messages that haven't been queued for saving yet."""
+    if len(st.session_state["messages"]) > st.session_state["saved_count"]:
+        _save_snapshot(wait=wait)
 
 
 class AshleyAIAssistant:
     def __init__(self):
         self._setup_page_config()
         self._initialize_session_state()
-        ensure_bucket()
+        _ensure_bucket()
 
     def _setup_page_config(self):
         st.set_page_config(
@@ -38,6 +127,9 @@ class AshleyAIAssistant:
             "messages": [],
             "session_id": str(uuid.uuid4()),
             "conversation_tokens": 0,
+            "pending_input": None,
+            "quick_start_asked": set(),
+            "saved_count": 0,
         }
         for key, val in defaults.items():
             if key not in st.session_state:
@@ -46,117 +138,151 @@ class AshleyAIAssistant:
     def render_sidebar(self):
         with st.sidebar:
             with st.expander("👤 Meet Ashley", expanded=False):
-                st.markdown("""
-**Ashley v6** is your IONOS Cloud AI assistant. She can:
-- Answer cloud and infrastructure questions
-- List your datacenters and servers
-- Create new servers on demand
-- Remember your conversations
-- Store and retrieve knowledge documents
-
-Built by **Isayah Young-Burke** for IONOS US Cloud.
-Powered by **Meta-Llama-3.3-70B** via IONOS AI Model Hub.
-                """)
+                st.markdown(ABOUT_MD)
 
             with st.expander("🚀 Quick Actions", expanded=True):
-                st.markdown("Click to run:")
-                quick_actions = [
-                    "List my datacenters",
-                    "Show all my servers",
-                    "What server templates are available?",
-                    "What cloud services does IONOS offer?",
-                    "List my knowledge base documents",
-                ]
-                for idx, question in enumerate(quick_actions):
-                    if st.button(question, key=f"quick_{idx}"):
-                        self.process_user_input(question)
+                self._render_quick_actions()
 
             with st.expander("💾 Conversation History", expanded=False):
-                st.markdown("**Current session:** `" + st.session_state["session_id"][:8] + "...`")
-                if st.button("Save current conversation"):
-                    save_conversation(st.session_state["session_id"], st.session_state["messages"])
-                    st.success("Saved to Object Storage.")
-
-                st.markdown("---")
-                st.markdown("**Past sessions:**")
-                sessions = list_conversations()
-                if not sessions:
-                    st.markdown("_No saved sessions yet._")
-                else:
-                    for s in sessions[:10]:
-                        col1, col2 = st.columns([3, 1])
-                        with col1:
-                            st.markdown(f"`{s['session_id'][:8]}...` — {s['last_modified'][:10]}")
-                        with col2:
-                            if st.button("Load", key=f"load_{s['session_id']}"):
-                                loaded = load_conversation(s["session_id"])
-                                st.session_state["messages"] = loaded
-                                st.session_state["session_id"] = s["session_id"]
-                                st.rerun()
+                self._render_conversation_history()
 
             with st.expander("📚 Knowledge Base", expanded=False):
-                st.markdown("Upload documents for Ashley to reference:")
-                uploaded = st.file_uploader("Upload a document", type=["txt", "md", "pdf"])
-                if uploaded:
-                    result = upload_knowledge_doc(uploaded.name, uploaded.read(), uploaded.type)
-                    st.success(result)
+                self._render_knowledge_base()
 
             with st.expander("🌐 Resources", expanded=False):
-                st.markdown("[LinkedIn](https://www.linkedin.com/in/young-burke/)")
-                st.markdown("[IONOS Cloud](https://cloud.ionos.com)")
-                st.markdown("[IONOS Docs](https://docs.ionos.com)")
-                st.markdown("[API Docs](https://api.ionos.com/docs/inference-openai/v1)")
+                st.markdown(RESOURCES_MD)
 
             with st.expander("📌 Patch Notes", expanded=False):
-                st.markdown("## Ashley v6")
-                st.markdown("### New in v6")
-                st.markdown("* **RAG** — upload docs, Ashley embeds them via `BAAI/bge-large-en-v1.5` and retrieves context on every query")
-                st.markdown("* **Start / Stop / Delete servers** — full server lifecycle from chat")
-                st.markdown("* **Server templates** — web, pentest, n8n, db, dev presets")
-                st.markdown("### v5")
-                st.markdown("* Llama 3.3 70B, tool calling, streaming, Object Storage, session history")
-                st.markdown("### v4")
-                st.markdown("* IONOS Cloud API integration, secure .env credentials")
-                st.markdown("### v3")
-                st.markdown("* AshleyAIAssistant class, quick start questions, sidebar")
+                self._render_patch_notes()
+
+    def _enqueue_quick_start(self, question):
+        # Runs before the rerun, so the chat fragment drains it on the same run.
+        # Skip a duplicate click that is still queued or whose answer is the latest turn.
+        if question == st.session_state["pending_input"] or question in st.session_state["quick_start_asked"]:
+            return
+        st.session_state["pending_input"] = question
+
+    # Quick actions stay outside a fragment: their click has to reach the chat.
+    def _render_quick_actions(self):
+        st.markdown("Click to run:")
+        asked = st.session_state["quick_start_asked"]
+        for key, question in QUICK_ACTIONS:
+            st.button(
+                question, key=key, disabled=question in asked,
+                on_click=self._enqueue_quick_start, args=(question,),
+            )
+
+    # The other sidebar panels run as fragments so their widgets rerun only
+    # themselves, not the chat history replay in handle_chat_interaction.
+    @st.fragment
+    def _render_conversation_history(self):
+        st.markdown("**Current session:** `" + st.session_state["session_id"][:8] + "...`")
+        if st.button("Save current conversation"):
+            # Through the session's save worker so a queued auto-save can't land after it
+            _save_snapshot(wait=True)
+            _list_sessions.clear()
+            st.success("Saved to Object Storage.")
+
+        st.markdown("---")
+        st.markdown("**Past sessions:**")
+        sessions = _list_sessions()
+        if not sessions:
+            st.markdown("_No saved sessions yet._")
+        else:
+            for s in sessions[:10]:
+                col1, col2 = st.columns([3, 1])
+                with col1:
+                    st.markdown(f"`{s['session_id'][:8]}...` — {s['last_modified'][:10]}")
+                with col2:
+                    if st.button("Load", key=f"load_{s['session_id']}"):
+                        # Wait, in case this is the current session being reloaded
+                        _flush_unsaved(wait=True)
+                        loaded = load_conversation(s["session_id"])
+                        st.session_state["messages"] = loaded
+                        st.session_state["session_id"] = s["session_id"]
+                        st.session_state["saved_count"] = len(loaded)
+                        st.session_state["quick_start_asked"] = set()
+                        st.rerun()
+
+    @st.fragment
+    def _render_knowledge_base(self):
+        st.markdown("Upload documents for Ashley to reference:")
+        uploaded = st.file_uploader("Upload a document", type=["txt", "md", "pdf"])
+        if uploaded:
+            result = upload_knowledge_doc(uploaded.name, uploaded.read(), uploaded.type)
+            st.success(result)
+
+    @st.fragment
+    def _render_patch_notes(self):
+        # A collapsed expander still ships its body, so only send the notes on request
+        if st.toggle("Show patch notes", key="show_patch_notes"):
+            st.markdown(PATCH_NOTES_MD)
 
     def process_user_input(self, user_input):
-        if not user_input or not isinstance(user_input, str):
+        if not user_input or not _NONBLANK(user_input):
             return
 
-        st.session_state["messages"].append({"role": "user", "content": user_input})
+        history = st.session_state["messages"]
+        user_turn = {"role": "user", "content": user_input}
+        recorded = False
 
-        with st.chat_message("user"):
-            st.markdown(user_input)
+        try:
+            # The history above doesn't hold this turn yet, so the live turn is
+            # rendered exactly once here; later runs replay it from history.
+            # No st.rerun(): that would cost a full extra run and hide the user's
+            # message until the whole reply had streamed.
+            with st.chat_message("user"):
+                st.markdown(user_input)
 
-        with st.chat_message("assistant"):
-            history = st.session_state["messages"][:-1]  # exclude current message
-            response_chunks = []
+            with st.chat_message("assistant"):
+                try:
+                    full_response = st.write_stream(stream_query_ionos(user_input, conversation_history=history)) or ""
+                except Exception as e:
+                    full_response = f"Error: {str(e)}"
+                    st.error(full_response)
+                # The backend reports its own failures as an "Error: ..." reply
+                answered = bool(full_response) and not full_response.startswith("Error:")
 
-            try:
-                placeholder = st.empty()
-                full_response = ""
-                for chunk in stream_query_ionos(user_input, conversation_history=history):
-                    full_response += chunk
-                    placeholder.markdown(full_response + "▌")
-                placeholder.markdown(full_response)
-                response_chunks = full_response
-            except Exception as e:
-                full_response = f"Error: {str(e)}"
-                st.error(full_response)
+                # Record the whole exchange in one write once the reply is complete
+                messages = history + [user_turn, {"role": "assistant", "content": full_response}]
+                st.session_state["messages"] = messages
+                recorded = True
+                # Only a successful answer that is the latest turn blocks a repeat click
+                st.session_state["quick_start_asked"] = (
+                    {user_input} if answered and user_input in _ANSWER_DEDUPED else set()
+                )
+                st.session_state["conversation_tokens"] += len(full_response.split())
 
-            st.session_state["messages"].append({"role": "assistant", "content": full_response})
-            st.session_state["conversation_tokens"] += len(full_response.split())
+                # Auto-save after every exchange, off the script thread
+                _save_snapshot()
+        finally:
+            if not recorded:
+                # A rerun stopped the script mid-reply (Streamlit's control
+                # exceptions skip `except Exception`); keep the prompt anyway
+                st.session_state["messages"] = history + [user_turn]
+                st.session_state["quick_start_asked"] = set()
 
-            # Auto-save after every exchange
-            save_conversation(st.session_state["session_id"], st.session_state["messages"])
+    def _render_history(self, messages):
+        # One chat_message container per run of same-role turns
+        for role, turns in groupby(messages, key=itemgetter("role")):
+            content = "\n\n---\n\n".join(turn["content"] for turn in turns)
+            with st.chat_message(role):
+                st.markdown(content)
 
+    @st.fragment
     def handle_chat_interaction(self):
-        for message in st.session_state["messages"]:
-            with st.chat_message(message["role"]):
-                st.markdown(message["content"])
+        messages = st.session_state["messages"]
+        older, recent = messages[:-HISTORY_WINDOW], messages[-HISTORY_WINDOW:]
+        # Like the patch notes, only send older turns on request. The label stays
+        # fixed because a changing label would reset the toggle's state.
+        if older and st.toggle("Show earlier messages", key="show_older"):
+            self._render_history(older)
+        self._render_history(recent)
 
-        if user_input := st.chat_input("Ask Ashley..."):
+        prompt = st.chat_input("Ask Ashley...")
+        pending = st.session_state["pending_input"]
+        st.session_state["pending_input"] = None
+        if user_input := pending or prompt:
             self.process_user_input(user_input)
 
     def run(self):
@@ -166,6 +292,7 @@ Powered by **Meta-Llama-3.3-70B** via IONOS AI Model Hub.
 
 
 def main():
+    _configure_logging()
     assistant = AshleyAIAssistant()
     assistant.run()
 
@@ -233,6 +233,15 @@ def _build_messages(prompt, conversation_history=None):
     return messages
 
 
+def _call_tools(tool_calls):
+    """Run (id, name, arguments) tool calls and return the tool messages to send back."""
+    results = []
+    for call_id, name, arguments in tool_calls:
+        args = json.loads(arguments) if arguments else {}
+        results.append({"tool_call_id": call_id, "role": "tool", "content": _dispatch_tool(name, args)})
+    return results
+
+
 def _run_tool_loop(messages):
     """Run the tool-calling loop until no more tool calls are needed. Returns final message."""
     response = client.chat.completions.create(
@@ -245,14 +254,10 @@ def _run_tool_loop(messages):
     message = response.choices[0].message
 
     while message.tool_calls:
-        tool_results = []
-        for tc in message.tool_calls:
-            args = json.loads(tc.function.arguments) if tc.function.arguments else {}
-            result = _dispatch_tool(tc.function.name, args)
-            tool_results.append({"tool_call_id": tc.id, "role": "tool", "content": result})
-
         messages.append(message)
-        messages.extend(tool_results)
+        messages.extend(_call_tools(
+            (tc.id, tc.function.name, tc.function.arguments) for tc in message.tool_calls
+        ))
 
         response = client.chat.completions.create(
             model=MODEL_NAME,
@@ -272,28 +277,61 @@ def query_ionos(prompt, conversation_history=None):
         messages, final_message = _run_tool_loop(messages)
         return final_message.content or "I couldn't generate a response. Please try again."
     except Exception as e:
-        logger.error(f"LLM query error: {e}")
+        logger.error("LLM query error: %s", e)
         return f"Error communicating with AI Model Hub: {str(e)}"
 
 
+def _stream_completion(messages):
+    """Stream one completion, yielding text deltas. Returns (content, tool_calls)."""
+    stream = client.chat.completions.create(
+        model=MODEL_NAME,
+        messages=messages,
+        tools=TOOLS,
+        tool_choice="auto",
+        stream=True,
+        max_tokens=1024,
+    )
+    parts = []
+    calls = {}
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta
+        if delta.content:
+            parts.append(delta.content)
+            yield delta.content
+        # Tool calls arrive in fragments keyed by index; stitch them back together
+        for tc in delta.tool_calls or []:
+            call = calls.setdefault(tc.index, {"id": None, "name": "", "arguments": ""})
+            if tc.id:
+                call["id"] = tc.id
+            if tc.function and tc.function.name:
+                call["name"] += tc.function.name
+            if tc.function and tc.function.arguments:
+                call["arguments"] += tc.function.arguments
+    return "".join(parts), [calls[idx] for idx in sorted(calls)]
+
+
 def stream_query_ionos(prompt, conversation_history=None):
-    """Resolve tool calls first, then stream the final answer."""
+    """Stream the answer token by token, running any tool calls in between."""
     try:
         messages = _build_messages(prompt, conversation_history)
-        messages, final_message = _run_tool_loop(messages)
-
-        if not final_message.tool_calls:
-            messages.append({"role": "assistant", "content": final_message.content})
-            stream = client.chat.completions.create(
-                model=MODEL_NAME,
-                messages=messages,
-                stream=True,
-                max_tokens=1024,
-            )
-            for chunk in stream:
-                delta = chunk.choices[0].delta.content
-                if delta:
-                    yield delta
+        while True:
+            content, tool_calls = yield from _stream_completion(messages)
+            if not tool_calls:
+                return
+            messages.append({
+                "role": "assistant",
+                "content": content or None,
+                "tool_calls": [
+                    {"id": c["id"], "type": "function", "function": {"name": c["name"], "arguments": c["arguments"]}}
+                    for c in tool_calls
+                ],
+            })
+            messages.extend(_call_tools((c["id"], c["name"], c["arguments"]) for c in tool_calls))
+            if content:
+                # Keep the next round's text from running into this round's preamble
+                yield "\n\n"
     except Exception as e:
-        logger.error(f"Streaming error: {e}")
+        logger.error("Streaming error: %s", e)
         yield f"Error: {str(e)}"
@@ -1,7 +1,10 @@
 import os
 from dotenv import load_dotenv
 
-load_dotenv()
+ENV_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".env")
+
+if os.path.isfile(ENV_FILE):
+    load_dotenv(ENV_FILE)
 
 IONOS_API_TOKEN = os.getenv("IONOS_API_TOKEN")
 IONOS_CLOUD_USERNAME = os.getenv("IONOS_CLOUD_USERNAME")
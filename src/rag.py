@@ -71,7 +71,7 @@ def _save_index(index):
             ContentType="application/json",
         )
     except Exception as e:
-        logger.warning(f"Could not save RAG index: {e}")
+        logger.warning("Could not save RAG index: %s", e)
 
 
 def index_document(filename, text):
@@ -100,7 +100,7 @@ def index_document(filename, text):
         _save_index(index)
         return f"Indexed `{filename}` — {len(chunks)} chunks embedded and stored."
     except Exception as e:
-        logger.error(f"Indexing error: {e}")
+        logger.error("Indexing error: %s", e)
         return f"Could not index document: {e}"
 
 
@@ -135,5 +135,5 @@ def retrieve_context(query, top_k=TOP_K):
 
         return "\n".join(lines)
     except Exception as e:
-        logger.warning(f"RAG retrieval error: {e}")
+        logger.warning("RAG retrieval error: %s", e)
         return None
@@ -25,9 +25,9 @@ def ensure_bucket():
         existing = [b["Name"] for b in client.list_buckets().get("Buckets", [])]
         if S3_BUCKET not in existing:
             client.create_bucket(Bucket=S3_BUCKET)
-            logger.info(f"Created bucket: {S3_BUCKET}")
+            logger.info("Created bucket: %s", S3_BUCKET)
     except Exception as e:
-        logger.warning(f"Could not ensure bucket exists: {e}")
+        logger.warning("Could not ensure bucket exists: %s", e)
 
 
 def save_conversation(session_id, messages):
@@ -47,7 +47,7 @@ def save_conversation(session_id, messages):
             ContentType="application/json",
         )
     except Exception as e:
-        logger.warning(f"Could not save conversation: {e}")
+        logger.warning("Could not save conversation: %s", e)
 
 
 def load_conversation(session_id):
@@ -78,7 +78,7 @@ def list_conversations():
             for obj in items
         ]
     except Exception as e:
-        logger.warning(f"Could not list conversations: {e}")
+        logger.warning("Could not list conversations: %s", e)
         return []
 
 
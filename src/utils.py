@@ -1,6 +1,12 @@
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from src.config import IONOS_CLOUD_USERNAME, IONOS_CLOUD_PASSWORD, CLOUD_API_BASE
 
+MAX_PARALLEL_REQUESTS = 8   # per-datacenter lookups fanned out at once
+
+# Shared session so Cloud API calls reuse pooled keep-alive connections
+_session = requests.Session()
+
 
 def _auth():
     return (IONOS_CLOUD_USERNAME, IONOS_CLOUD_PASSWORD)
@@ -11,7 +17,7 @@ def _headers():
 
 
 def list_datacenters():
-    resp = requests.get(f"{CLOUD_API_BASE}/datacenters", auth=_auth(), headers=_headers())
+    resp = _session.get(f"{CLOUD_API_BASE}/datacenters", auth=_auth(), headers=_headers())
     if resp.status_code != 200:
         return f"Error fetching datacenters: {resp.status_code} {resp.text}"
 
@@ -27,7 +33,7 @@ def list_datacenters():
 
 
 def list_servers(datacenter_id):
-    resp = requests.get(
+    resp = _session.get(
         f"{CLOUD_API_BASE}/datacenters/{datacenter_id}/servers",
         auth=_auth(), headers=_headers()
     )
@@ -50,7 +56,7 @@ def list_servers(datacenter_id):
 
 
 def list_all_servers():
-    resp = requests.get(f"{CLOUD_API_BASE}/datacenters", auth=_auth(), headers=_headers())
+    resp = _session.get(f"{CLOUD_API_BASE}/datacenters", auth=_auth(), headers=_headers())
     if resp.status_code != 200:
         return f"Error fetching datacenters: {resp.status_code} {resp.text}"
 
@@ -58,10 +64,12 @@ def list_all_servers():
     if not datacenters:
         return "No datacenters found."
 
+    with ThreadPoolExecutor(max_workers=MAX_PARALLEL_REQUESTS) as pool:
+        results = list(pool.map(lambda dc: list_servers(dc["id"]), datacenters))
+
     all_lines = []
-    for dc in datacenters:
+    for dc, result in zip(datacenters, results):
         dc_name = dc.get("properties", {}).get("name", "Unnamed")
-        result = list_servers(dc["id"])
         all_lines.append(f"### {dc_name}")
         all_lines.append(result)
 
@@ -77,7 +85,7 @@ def create_server(datacenter_id, name, cores=2, ram_mb=4096, cpu_family="INTEL_I
             "cpuFamily": cpu_family
         }
     }
-    resp = requests.post(
+    resp = _session.post(
         f"{CLOUD_API_BASE}/datacenters/{datacenter_id}/servers",
         auth=_auth(), headers=_headers(), json=body
     )
@@ -94,7 +102,7 @@ def create_server(datacenter_id, name, cores=2, ram_mb=4096, cpu_family="INTEL_I
 
 
 def get_datacenter_id_by_name(name):
-    resp = requests.get(f"{CLOUD_API_BASE}/datacenters", auth=_auth(), headers=_headers())
+    resp = _session.get(f"{CLOUD_API_BASE}/datacenters", auth=_auth(), headers=_headers())
     if resp.status_code != 200:
         return None
     for dc in resp.json().get("items", []):
@@ -104,7 +112,7 @@ def get_datacenter_id_by_name(name):
 
 
 def _get_server_id_by_name(datacenter_id, server_name):
-    resp = requests.get(
+    resp = _session.get(
         f"{CLOUD_API_BASE}/datacenters/{datacenter_id}/servers",
         auth=_auth(), headers=_headers()
     )
@@ -117,7 +125,7 @@ def _get_server_id_by_name(datacenter_id, server_name):
 
 
 def start_server(datacenter_id, server_id):
-    resp = requests.post(
+    resp = _session.post(
         f"{CLOUD_API_BASE}/datacenters/{datacenter_id}/servers/{server_id}/start",
         auth=_auth(), headers=_headers()
     )
@@ -127,7 +135,7 @@ def start_server(datacenter_id, server_id):
 
 
 def stop_server(datacenter_id, server_id):
-    resp = requests.post(
+    resp = _session.post(
         f"{CLOUD_API_BASE}/datacenters/{datacenter_id}/servers/{server_id}/stop",
         auth=_auth(), headers=_headers()
     )
@@ -137,7 +145,7 @@ def stop_server(datacenter_id, server_id):
 
 
 def delete_server(datacenter_id, server_id):
-    resp = requests.delete(
+    resp = _session.delete(
         f"{CLOUD_API_BASE}/datacenters/{datacenter_id}/servers/{server_id}",
         auth=_auth(), headers=_headers()
     )
@@ -148,11 +156,13 @@ def delete_server(datacenter_id, server_id):
 
 def find_server_across_datacenters(server_name):
     """Search all datacenters for a server by name. Returns (dc_id, server_id) or (None, None)."""
-    resp = requests.get(f"{CLOUD_API_BASE}/datacenters", auth=_auth(), headers=_headers())
+    resp = _session.get(f"{CLOUD_API_BASE}/datacenters", auth=_auth(), headers=_headers())
     if resp.status_code != 200:
         return None, None
-    for dc in resp.json().get("items", []):
-        server_id = _get_server_id_by_name(dc["id"], server_name)
+    datacenters = resp.json().get("items", [])
+    with ThreadPoolExecutor(max_workers=MAX_PARALLEL_REQUESTS) as pool:
+        server_ids = list(pool.map(lambda dc: _get_server_id_by_name(dc["id"], server_name), datacenters))
+    for dc, server_id in zip(datacenters, server_ids):
         if server_id:
             return dc["id"], server_id
     return None, None